@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for self-hosted deployments.
+
+Every handler is dominated by outbound IO (Supabase, blob storage, the
+AI gateway), so threaded workers keep requests flowing while one is
+parked on a network call; sync workers would cap throughput at the
+worker count. Run with: gunicorn -c gunicorn.conf.py src.main:app
+"""
+import multiprocessing
+
+bind = "0.0.0.0:5000"
+worker_class = "gthread"
+workers = multiprocessing.cpu_count() * 2 + 1
+threads = 16
+
+# Analyses block on the AI call for a while; don't kill them mid-flight
+timeout = 120
+
+# Recycle workers occasionally so slow leaks can't accumulate
+max_requests = 1000
+max_requests_jitter = 100
@@ -4,6 +4,13 @@ Simple test for ContractCritic backend core functionality
 """
 import os
 import sys
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def _get_app():
+    """Import the Flask app once and reuse it across tests"""
+    from src.main import app
+    return app
 
 def test_imports():
     """Test that all modules can be imported correctly"""
@@ -18,7 +25,7 @@ def test_imports():
         return False
     
     try:
-        from src.models.user import User, db
+        from src.models.user import User
         print("✅ User model imported successfully")
     except Exception as e:
         print(f"❌ User model import failed: {e}")
@@ -90,31 +97,26 @@ def test_contract_analyzer():
         return False
 
 def test_models():
-    """Test database models"""
-    print("\n🗄️  Testing Database Models")
+    """Test data models"""
+    print("\n🗄️  Testing Data Models")
     print("=" * 40)
-    
+
     try:
         from src.models.contract import Contract, ContractAnalysis, RiskFactor
-        from datetime import datetime
-        
+
         # Test Contract model
         contract = Contract(
-            user_id=1,
-            filename="test.pdf",
+            user_id="00000000-0000-0000-0000-000000000001",
             original_filename="test_contract.pdf",
-            file_path="/tmp/test.pdf",
-            file_size=1024,
-            mime_type="application/pdf"
+            file_size=1024
         )
-        
+
         contract_dict = contract.to_dict()
-        print(f"✅ Contract model: {contract_dict['filename']}")
-        
+        print(f"✅ Contract model: {contract_dict['original_filename']}")
+
         # Test ContractAnalysis model
         analysis = ContractAnalysis(
-            contract_id=1,
-            ai_model_used="gpt-3.5-turbo",
+            contract_id="00000000-0000-0000-0000-000000000002",
             analysis_type="comprehensive",
             risk_score=65.5,
             risk_level="Medium"
@@ -131,7 +133,7 @@ def test_models():
         
         # Test RiskFactor model
         risk_factor = RiskFactor(
-            analysis_id=1,
+            analysis_id="00000000-0000-0000-0000-000000000003",
             category="Payment Risk",
             severity="high",
             description="Payment terms are unclear",
@@ -155,18 +157,13 @@ def test_flask_app():
     print("=" * 40)
     
     try:
-        from src.main import app
-        
+        app = _get_app()
+
         with app.app_context():
             print("✅ Flask app created successfully")
             print(f"   App name: {app.name}")
             print(f"   Debug mode: {app.debug}")
-            
-            # Test that database tables can be created
-            from src.models.user import db
-            db.create_all()
-            print("✅ Database tables created successfully")
-        
+
         return True
         
     except Exception as e:
@@ -179,13 +176,17 @@ def main():
     """Run all tests"""
     print("🚀 ContractCritic Backend - Core Functionality Test")
     print("=" * 60)
-    
+
     tests = [
         ("Module Imports", test_imports),
-        ("Database Models", test_models),
+        ("Data Models", test_models),
         ("ContractAnalyzer Service", test_contract_analyzer),
         ("Flask Application", test_flask_app)
     ]
+
+    # --skip-flask keeps dev loops fast by not importing the full app stack
+    if "--skip-flask" in sys.argv:
+        tests = [t for t in tests if t[1] is not test_flask_app]
     
     passed = 0
     total = len(tests)
@@ -8,15 +8,56 @@ load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+# Configure logging once for the whole app, before importing modules
+# that create their loggers
+from logging.config import dictConfig
+
+dictConfig({
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'default': {
+            'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        }
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'default'
+        }
+    },
+    'root': {
+        'level': 'INFO',
+        'handlers': ['console']
+    }
+})
+
+import orjson
 from flask import Flask, send_from_directory, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from src.routes.user import user_bp
-from src.routes.contract import contract_bp
+from src.routes.contract import contract_bp, MAX_FILE_SIZE
 from src.services.supabase_client import supabase_service
 from src.services.blob_storage import blob_service
 
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson for faster response serialization"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+app.json = OrjsonProvider(app)
+# Werkzeug rejects oversized bodies before the multipart parser runs,
+# so a too-large upload never costs parse CPU or temp-file spooling
+app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
 # Enable CORS for all routes
 CORS(app, origins="*")
@@ -48,6 +89,13 @@ def serve(path):
         else:
             return "index.html not found", 404
 
+@app.errorhandler(413)
+def request_entity_too_large(error):
+    return jsonify({
+        'success': False,
+        'error': f'File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB'
+    }), 413
+
 # Health check endpoint
 @app.route('/api/health', methods=['GET'])
 def health_check():
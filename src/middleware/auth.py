@@ -1,15 +1,169 @@
 from functools import wraps
-from flask import request, jsonify, g
-from jose import jwt, JWTError
+from flask import request, g, Response
+import base64
+import collections
+import hashlib
+import hmac
 import os
-import requests
 import json
+import logging
+import threading
+import time
 from typing import Optional, Dict, Any
 
+# jose and requests are imported lazily: jose is only needed for RS/ES
+# tokens and requests only for the first JWKS fetch, so the auth module
+# stays cheap to import on serverless cold starts
+
+logger = logging.getLogger(__name__)
+
+# Error bodies are serialized once at import; jsonify would rebuild the
+# JSON on every rejected request, which dominates under bot traffic
+_ERR_NO_HEADER = b'{"error": "No authorization header provided"}'
+_ERR_BAD_FORMAT = b'{"error": "Invalid authorization header format"}'
+_ERR_NO_TOKEN = b'{"error": "No token provided"}'
+_ERR_BAD_TOKEN = b'{"error": "Invalid or expired token"}'
+_ERR_NO_USER_ID = b'{"error": "Invalid token: missing user ID"}'
+_ERR_ADMIN_REQUIRED = b'{"error": "Admin access required"}'
+
+def _auth_error(body: bytes, status: int = 401) -> Response:
+    """Build an error response from a prebuilt JSON body"""
+    return Response(body, status=status, mimetype='application/json')
+
+class _TokenCache:
+    """Small LRU cache for decoded JWT payloads, evicting on token expiry.
+
+    Keys are blake2b digests of the raw token so tokens themselves are never
+    held in memory. Reads are lock-free (dict get is atomic under the GIL);
+    the lock only guards mutation.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(self._key(token))
+        if entry is None:
+            return None
+        payload, exp = entry
+        if exp <= time.time():
+            with self._lock:
+                self._entries.pop(self._key(token), None)
+            return None
+        return payload
+
+    def put(self, token: str, payload: Dict[str, Any]):
+        exp = payload.get('exp')
+        if not exp:
+            return
+        with self._lock:
+            self._entries[self._key(token)] = (payload, exp)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+_token_cache = _TokenCache()
+
+def _b64url_decode(segment: str) -> bytes:
+    """Base64url-decode a JWT segment, restoring stripped padding"""
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+def _verify_hs256_fast(token: str, secret_bytes: bytes) -> Optional[Dict[str, Any]]:
+    """Verify an HS256 token directly with hmac/hashlib, bypassing python-jose.
+
+    OpenSSL's SHA-256 is much faster than jose's pure-Python byte handling.
+    Returns the payload dict, or None if the token is invalid or expired.
+    """
+    try:
+        header_b64, payload_b64, sig_b64 = token.split('.', 2)
+        expected = hmac.new(
+            secret_bytes,
+            f"{header_b64}.{payload_b64}".encode(),
+            hashlib.sha256
+        ).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(sig_b64)):
+            return None
+        payload = json.loads(_b64url_decode(payload_b64))
+    except (ValueError, TypeError):
+        return None
+
+    # jose validated exp and aud for us; here we check them manually
+    exp = payload.get('exp')
+    if exp is not None and exp < time.time():
+        return None
+    if not _check_aud(payload):
+        return None
+    return payload
+
+def _check_aud(payload: Dict[str, Any]) -> bool:
+    """Validate the fixed 'authenticated' audience claim"""
+    aud = payload.get('aud')
+    if isinstance(aud, list):
+        return 'authenticated' in aud
+    return aud == 'authenticated'
+
+# Reused session so JWKS fetches don't pay a new TCP/TLS handshake each time
+_jwks_session = None
+
+# Successful JWK lookups are cached for good; misses and fetch failures
+# only back off briefly so a transient JWKS error or an in-flight key
+# rotation never poisons a key id until restart
+_JWK_RETRY_SECONDS = 60
+_jwk_cache: Dict[str, str] = {}
+_jwk_retry_after: Dict[str, float] = {}
+_jwk_lock = threading.Lock()
+
+def _get_jwk(kid: str) -> Optional[str]:
+    """Fetch the Supabase JWKS and cache the JWK for each key id"""
+    cached = _jwk_cache.get(kid)
+    if cached is not None:
+        return cached
+    now = time.time()
+    if _jwk_retry_after.get(kid, 0) > now:
+        return None
+
+    global _jwks_session
+    supabase_url = os.getenv("SUPABASE_URL")
+    if not supabase_url:
+        return None
+    try:
+        if _jwks_session is None:
+            import requests
+            _jwks_session = requests.Session()
+        response = _jwks_session.get(
+            f"{supabase_url}/auth/v1/.well-known/jwks.json",
+            timeout=10
+        )
+        response.raise_for_status()
+        with _jwk_lock:
+            # Cache the whole key set as JSON strings; one fetch serves
+            # every kid the server currently publishes
+            for key in response.json().get("keys", []):
+                key_id = key.get("kid")
+                if key_id:
+                    _jwk_cache[key_id] = json.dumps(key)
+            found = _jwk_cache.get(kid)
+            if found is None:
+                _jwk_retry_after[kid] = now + _JWK_RETRY_SECONDS
+        return found
+    except Exception as e:
+        logger.warning("Could not fetch JWKS: %s", e)
+        with _jwk_lock:
+            _jwk_retry_after[kid] = now + _JWK_RETRY_SECONDS
+        return None
+
 class SupabaseAuth:
     def __init__(self):
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.jwt_secret = None
+        # HS256 fallback for local development where no JWKS is published;
+        # disable with SUPABASE_ALLOW_HS256=false once asymmetric keys are live
+        self.allow_hs256 = os.getenv("SUPABASE_ALLOW_HS256", "true").lower() in ("1", "true", "yes")
         self._fetch_jwt_secret()
     
     def _fetch_jwt_secret(self):
@@ -20,30 +174,65 @@ class SupabaseAuth:
             self.jwt_secret = os.getenv("SUPABASE_JWT_SECRET") or os.getenv("JWT_SECRET_KEY")
             
             if not self.jwt_secret:
-                print("Warning: No JWT secret found in environment variables")
+                logger.warning("No JWT secret found in environment variables")
                 self.jwt_secret = "your-jwt-secret-here"  # Fallback for development
             else:
-                print("JWT secret loaded successfully")
+                logger.info("JWT secret loaded successfully")
         except Exception as e:
-            print(f"Warning: Could not fetch JWT secret: {e}")
+            logger.warning("Could not fetch JWT secret: %s", e)
             self.jwt_secret = "your-jwt-secret-here"  # Fallback for development
+        # Precomputed for the direct hmac verification path
+        self._secret_bytes = self.jwt_secret.encode()
     
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify JWT token and return payload"""
+        # Repeat calls with the same token skip signature verification entirely
+        cached = _token_cache.get(token)
+        if cached is not None:
+            return cached
+        payload = self._verify_token_uncached(token)
+        if payload is not None:
+            _token_cache.put(token, payload)
+        return payload
+
+    def _verify_token_uncached(self, token: str) -> Optional[Dict[str, Any]]:
+        from jose import jwt, JWTError
         try:
-            # Decode the JWT token
-            payload = jwt.decode(
-                token,
-                self.jwt_secret,
-                algorithms=["HS256"],
-                audience="authenticated"
-            )
+            # Prefer asymmetric verification against the cached Supabase JWKS
+            header = jwt.get_unverified_header(token)
+            kid = header.get("kid")
+            if kid and header.get("alg") in ("ES256", "RS256"):
+                jwk_json = _get_jwk(kid)
+                if jwk_json:
+                    # The audience is a fixed constant; checking it ourselves
+                    # skips jose's per-call claim normalization
+                    payload = jwt.decode(
+                        token,
+                        json.loads(jwk_json),
+                        algorithms=["ES256", "RS256"],
+                        options={"verify_aud": False}
+                    )
+                    if not _check_aud(payload):
+                        logger.warning("JWT verification failed: bad audience")
+                        return None
+                    return payload
+                logger.warning("JWT verification failed: unknown key id %s", kid)
+                return None
+
+            if not self.allow_hs256:
+                logger.warning("JWT verification failed: HS256 tokens are disabled")
+                return None
+
+            # Verify HS256 tokens directly with hmac (local dev fallback)
+            payload = _verify_hs256_fast(token, self._secret_bytes)
+            if payload is None:
+                logger.warning("JWT verification failed: bad HS256 signature or claims")
             return payload
         except JWTError as e:
-            print(f"JWT verification failed: {e}")
+            logger.warning("JWT verification failed: %s", e)
             return None
         except Exception as e:
-            print(f"Token verification error: {e}")
+            logger.warning("Token verification error: %s", e)
             return None
     
     def extract_user_info(self, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -66,23 +255,24 @@ def require_auth(f):
         # Get authorization header
         auth_header = request.headers.get('Authorization')
         if not auth_header:
-            return jsonify({'error': 'No authorization header provided'}), 401
-        
-        # Check if it's a Bearer token
-        if not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Invalid authorization header format'}), 401
+            return _auth_error(_ERR_NO_HEADER)
         
-        # Extract token
-        token = auth_header.split(' ')[1]
+        # Single-pass parse: partition avoids the list allocation of split
+        prefix, _, token = auth_header.partition(' ')
+        if prefix != 'Bearer':
+            return _auth_error(_ERR_BAD_FORMAT)
         if not token:
-            return jsonify({'error': 'No token provided'}), 401
+            return _auth_error(_ERR_NO_TOKEN)
         
         # Verify token
         payload = supabase_auth.verify_token(token)
         if not payload:
-            return jsonify({'error': 'Invalid or expired token'}), 401
+            return _auth_error(_ERR_BAD_TOKEN)
         
-        # Extract user info and store in Flask's g object
+        # Extract user info and store in Flask's g object; the raw token
+        # is kept so views can forward it to Supabase without re-parsing
+        # the Authorization header
+        g.jwt_token = token
         user_info = supabase_auth.extract_user_info(payload)
         g.user_id = user_info['user_id']
         g.user_email = user_info['email']
@@ -90,7 +280,7 @@ def require_auth(f):
         
         # Ensure user_id exists
         if not g.user_id:
-            return jsonify({'error': 'Invalid token: missing user ID'}), 401
+            return _auth_error(_ERR_NO_USER_ID)
         
         return f(*args, **kwargs)
     
@@ -112,7 +302,7 @@ def require_admin(f):
     def decorated_function(*args, **kwargs):
         user = get_current_user()
         if not user or user.get('role') != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
+            return _auth_error(_ERR_ADMIN_REQUIRED, 403)
         return f(*args, **kwargs)
     
     return decorated_function
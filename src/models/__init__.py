@@ -4,17 +4,30 @@ Data models for Supabase integration.
 This module contains dataclasses that represent the structure of data
 stored in Supabase. These are used for type hints and data validation.
 
-Actual database operations are handled by the Supabase client in 
+Actual database operations are handled by the Supabase client in
 services/supabase_client.py
 """
 
-# Import all models for easy access
-from .contract import Contract, ContractAnalysis, RiskFactor
-from .user import User
-
 __all__ = [
     'Contract',
-    'ContractAnalysis', 
+    'ContractAnalysis',
     'RiskFactor',
     'User'
 ]
+
+# PEP 562 lazy re-exports: the model modules are only imported when a
+# class is first accessed, keeping `import src.models` cheap on cold start
+_MODULE_BY_NAME = {
+    'Contract': 'contract',
+    'ContractAnalysis': 'contract',
+    'RiskFactor': 'contract',
+    'User': 'user',
+}
+
+
+def __getattr__(name):
+    module_name = _MODULE_BY_NAME.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(f'.{module_name}', __name__), name)
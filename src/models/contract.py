@@ -7,11 +7,48 @@ Actual database operations are handled by the Supabase client in services/supaba
 
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
-import json
+from dataclasses import dataclass, field, fields
+import sys
+import orjson
 
 
-@dataclass
+def _isoformat(dt: Optional[datetime]) -> Optional[str]:
+    """Format an optional datetime as an ISO string"""
+    return dt.isoformat() if dt else None
+
+
+if sys.version_info >= (3, 11):
+    # fromisoformat accepts the trailing 'Z' natively on 3.11+,
+    # skipping a string allocation per timestamp field
+    _parse_dt = datetime.fromisoformat
+else:
+    def _parse_dt(value: str) -> datetime:
+        """Parse an ISO timestamp as returned by Supabase"""
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _init_field_tables(cls):
+    """Precompute the field lookup tables from_dict uses per class"""
+    cls._FIELDS = frozenset(f.name for f in fields(cls) if not f.name.startswith('_'))
+    cls._DT_FIELDS = frozenset(
+        f.name for f in fields(cls)
+        if f.type == Optional[datetime] and not f.name.startswith('_')
+    )
+    return cls
+
+
+def _extract_kwargs(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Filter a Supabase row down to known fields, parsing timestamps"""
+    kwargs = {k: v for k, v in data.items() if k in cls._FIELDS}
+    for name in cls._DT_FIELDS:
+        value = kwargs.get(name)
+        if isinstance(value, str):
+            kwargs[name] = _parse_dt(value)
+    return kwargs
+
+
+@_init_field_tables
+@dataclass(slots=True)
 class Contract:
     """Contract data model for Supabase integration"""
     id: Optional[str] = None  # UUID in Supabase
@@ -24,10 +61,16 @@ class Contract:
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     analyses_count: int = 0
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+    _dict_version: Optional[datetime] = field(default=None, repr=False, compare=False)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API responses"""
-        return {
+        # Reuse the cached payload while the row hasn't been touched, so
+        # list endpoints don't rebuild the dict per serialization
+        if self._dict_cache is not None and self._dict_version == self.updated_at:
+            return self._dict_cache
+        self._dict_cache = {
             'id': self.id,
             'user_id': self.user_id,
             'original_filename': self.original_filename,
@@ -35,29 +78,21 @@ class Contract:
             'contract_type': self.contract_type,
             'status': self.status,
             'blob_url': self.blob_url,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': _isoformat(self.created_at),
+            'updated_at': _isoformat(self.updated_at),
             'analyses_count': self.analyses_count
         }
+        self._dict_version = self.updated_at
+        return self._dict_cache
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Contract':
         """Create Contract instance from dictionary"""
-        return cls(
-            id=data.get('id'),
-            user_id=data.get('user_id'),
-            original_filename=data.get('original_filename'),
-            file_size=data.get('file_size'),
-            contract_type=data.get('contract_type'),
-            status=data.get('status', 'uploaded'),
-            blob_url=data.get('blob_url'),
-            created_at=datetime.fromisoformat(data['created_at'].replace('Z', '+00:00')) if data.get('created_at') else None,
-            updated_at=datetime.fromisoformat(data['updated_at'].replace('Z', '+00:00')) if data.get('updated_at') else None,
-            analyses_count=data.get('analyses_count', 0)
-        )
-
-
-@dataclass
+        return cls(**_extract_kwargs(cls, data))
+
+
+@_init_field_tables
+@dataclass(slots=True)
 class ContractAnalysis:
     """Contract analysis data model for Supabase integration"""
     id: Optional[str] = None  # UUID in Supabase
@@ -73,6 +108,8 @@ class ContractAnalysis:
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     risk_factors: List['RiskFactor'] = None
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+    _dict_version: Optional[datetime] = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
         if self.risk_factors is None:
@@ -80,7 +117,9 @@ class ContractAnalysis:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API responses"""
-        return {
+        if self._dict_cache is not None and self._dict_version == self.updated_at:
+            return self._dict_cache
+        self._dict_cache = {
             'id': self.id,
             'contract_id': self.contract_id,
             'user_id': self.user_id,
@@ -91,32 +130,34 @@ class ContractAnalysis:
             'analysis_results': self.analysis_results or {},
             'processing_time_ms': self.processing_time_ms,
             'tokens_used': self.tokens_used,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': _isoformat(self.created_at),
+            'updated_at': _isoformat(self.updated_at),
             'risk_factors': [rf.to_dict() for rf in self.risk_factors] if self.risk_factors else []
         }
+        self._dict_version = self.updated_at
+        return self._dict_cache
+
+    def set_analysis_results(self, results: Optional[Dict[str, Any]]):
+        """Store analysis results and invalidate the cached payload"""
+        self.analysis_results = results
+        self._dict_cache = None
+
+    def get_analysis_results(self) -> Dict[str, Any]:
+        """Return analysis results, decoding legacy JSON-string rows with orjson"""
+        if isinstance(self.analysis_results, str):
+            self.analysis_results = orjson.loads(self.analysis_results)
+        return self.analysis_results or {}
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ContractAnalysis':
         """Create ContractAnalysis instance from dictionary"""
-        return cls(
-            id=data.get('id'),
-            contract_id=data.get('contract_id'),
-            user_id=data.get('user_id'),
-            analysis_type=data.get('analysis_type'),
-            status=data.get('status', 'pending'),
-            risk_score=data.get('risk_score'),
-            risk_level=data.get('risk_level'),
-            analysis_results=data.get('analysis_results'),
-            processing_time_ms=data.get('processing_time_ms'),
-            tokens_used=data.get('tokens_used'),
-            created_at=datetime.fromisoformat(data['created_at'].replace('Z', '+00:00')) if data.get('created_at') else None,
-            updated_at=datetime.fromisoformat(data['updated_at'].replace('Z', '+00:00')) if data.get('updated_at') else None,
-            risk_factors=[RiskFactor.from_dict(rf) for rf in data.get('risk_factors', [])]
-        )
-
-
-@dataclass
+        kwargs = _extract_kwargs(cls, data)
+        kwargs['risk_factors'] = [RiskFactor.from_dict(rf) for rf in data.get('risk_factors') or []]
+        return cls(**kwargs)
+
+
+@_init_field_tables
+@dataclass(slots=True)
 class RiskFactor:
     """Risk factor data model for Supabase integration"""
     id: Optional[str] = None  # UUID in Supabase
@@ -140,20 +181,10 @@ class RiskFactor:
             'title': self.title,
             'description': self.description,
             'recommendation': self.recommendation,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': _isoformat(self.created_at)
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'RiskFactor':
         """Create RiskFactor instance from dictionary"""
-        return cls(
-            id=data.get('id'),
-            analysis_id=data.get('analysis_id'),
-            user_id=data.get('user_id'),
-            category=data.get('category'),
-            severity=data.get('severity'),
-            title=data.get('title'),
-            description=data.get('description'),
-            recommendation=data.get('recommendation'),
-            created_at=datetime.fromisoformat(data['created_at'].replace('Z', '+00:00')) if data.get('created_at') else None
-        )
+        return cls(**_extract_kwargs(cls, data))
@@ -10,8 +10,10 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
 
+from .contract import _isoformat, _parse_dt
 
-@dataclass
+
+@dataclass(slots=True)
 class User:
     """User data model for Supabase integration"""
     id: Optional[str] = None  # UUID from auth.users
@@ -26,8 +28,8 @@ class User:
             'id': self.id,
             'email': self.email,
             'name': self.name,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': _isoformat(self.created_at),
+            'updated_at': _isoformat(self.updated_at)
         }
 
     @classmethod
@@ -37,6 +39,6 @@ class User:
             id=data.get('id'),
             email=data.get('email'),
             name=data.get('name'),
-            created_at=datetime.fromisoformat(data['created_at'].replace('Z', '+00:00')) if data.get('created_at') else None,
-            updated_at=datetime.fromisoformat(data['updated_at'].replace('Z', '+00:00')) if data.get('updated_at') else None
+            created_at=_parse_dt(data['created_at']) if data.get('created_at') else None,
+            updated_at=_parse_dt(data['updated_at']) if data.get('updated_at') else None
         )
@@ -1,5 +1,7 @@
+import heapq
 import os
 import uuid
+from collections import Counter
 from datetime import datetime
 from flask import Blueprint, request, jsonify, g
 from src.middleware.auth import require_auth, get_current_user
@@ -7,22 +9,108 @@ from src.services.supabase_client import supabase_service
 from src.services.blob_storage import blob_service
 from src.services.contract_analyzer import ContractAnalyzer
 import logging
-import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 contract_bp = Blueprint('contract', __name__)
 
 # Configuration
-ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc', 'txt'}
+ALLOWED_EXTENSIONS = frozenset({'pdf', 'docx', 'doc', 'txt'})
+_ALLOWED_SUFFIXES = tuple('.' + ext for ext in ALLOWED_EXTENSIONS)
+_ALLOWED_EXT_MSG = ", ".join(sorted(ALLOWED_EXTENSIONS))
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+VALID_STATUSES = frozenset({'uploaded', 'processing', 'analyzed', 'error'})
+
+# MIME types derived from the (already validated) extension; the
+# client-supplied file.mimetype is whatever the browser felt like sending
+_EXT_TO_MIME = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'doc': 'application/msword',
+    'txt': 'text/plain',
+}
+
+def _mime_for(filename):
+    """Look up the MIME type for an allowed filename's extension"""
+    return _EXT_TO_MIME.get(filename.rsplit('.', 1)[-1].lower(), 'application/octet-stream')
+
+# Pooled client for fetching contract files from blob storage; reusing
+# connections avoids a fresh TCP+TLS handshake per analysis
+_blob_http = requests.Session()
+_blob_http.mount('https://', HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=2))
+
+# The analyzer owns an OpenAI client with its own connection pool, so it
+# is built once per process and shared; construction is deferred to first
+# use to keep imports cheap on cold start
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+def _get_analyzer():
+    """Return the shared ContractAnalyzer, creating it on first use"""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = ContractAnalyzer()
+    return _analyzer
+
+# Blob deletions are best-effort cleanup that the client never needs to
+# wait for, so they run off the request path on a small worker pool
+_cleanup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='blob-cleanup')
+
+# Pool for independent Supabase writes the handler fires concurrently
+_io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='supabase-io')
+
+def _delete_blob_quietly(file_url):
+    """Delete a blob in the background, logging instead of raising"""
+    try:
+        blob_service.delete_file(file_url)
+    except Exception as e:
+        logger.warning("Could not delete file %s: %s", file_url, e)
+
+# Maps the analyzer's five risk levels onto the dashboard's three
+# buckets; a dict hit replaces per-row lower()/substring matching
+_RISK_BUCKET = {
+    'high': 'high_risk',
+    'medium': 'medium_risk',
+    'medium-high': 'medium_risk',
+    'medium-low': 'medium_risk',
+    'low': 'low_risk',
+}
+
+# Dashboard stats only change when a contract is uploaded, analyzed or
+# deleted, so a short per-user TTL cache absorbs repeated page refreshes
+# without extra Supabase round-trips
+_STATS_TTL_SECONDS = 30
+_stats_cache = {}
+_stats_lock = threading.Lock()
+
+def _get_cached_stats(user_id):
+    """Return cached dashboard stats for a user, or None if stale/missing"""
+    entry = _stats_cache.get(user_id)
+    if entry and entry[1] > time.time():
+        return entry[0]
+    return None
+
+def _set_cached_stats(user_id, stats):
+    with _stats_lock:
+        _stats_cache[user_id] = (stats, time.time() + _STATS_TTL_SECONDS)
+
+def _invalidate_stats(user_id):
+    """Drop cached stats after a write that changes them"""
+    _stats_cache.pop(user_id, None)
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    # endswith with a tuple is a single C-level pass, with no rsplit
+    # allocation and an implicit check that a dot is present
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
 
 def get_file_size(file):
     """Get file size in bytes"""
@@ -39,6 +127,14 @@ def upload_contract():
     Expects multipart/form-data with 'file' field.
     """
     try:
+        # Reject oversized requests from the Content-Length header before
+        # request.files forces Werkzeug to parse and spool the whole body
+        if request.content_length and request.content_length > MAX_FILE_SIZE:
+            return jsonify({
+                'success': False,
+                'error': f'File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB'
+            }), 413
+
         # Check if file is present
         if 'file' not in request.files:
             return jsonify({
@@ -59,7 +155,7 @@ def upload_contract():
         if not allowed_file(file.filename):
             return jsonify({
                 'success': False,
-                'error': f'File type not allowed. Supported formats: {", ".join(ALLOWED_EXTENSIONS)}'
+                'error': f'File type not allowed. Supported formats: {_ALLOWED_EXT_MSG}'
             }), 400
         
         # Check file size
@@ -70,15 +166,15 @@ def upload_contract():
                 'error': f'File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB'
             }), 400
         
-        # Read file content
-        file_content = file.read()
-        file.seek(0)  # Reset for potential re-use
-        
-        # Upload to Vercel Blob Storage
+        mime_type = _mime_for(file.filename)
+
+        # Stream the upload straight to Vercel Blob Storage instead of
+        # buffering the whole file in memory first
         blob_result = blob_service.upload_file(
-            file_content,
+            file.stream,
             file.filename,
-            file.mimetype
+            mime_type,
+            size=file_size
         )
         
         if not blob_result:
@@ -94,27 +190,25 @@ def upload_contract():
             'original_filename': file.filename,
             'file_url': blob_result['url'],
             'file_size': file_size,
-            'mime_type': file.mimetype,
+            'mime_type': mime_type,
             'status': 'uploaded'
         }
         
-        # Extract JWT token for audit logging
-        token = request.headers.get('Authorization').split(' ')[1]
+        token = g.jwt_token
         contract = supabase_service.create_contract(contract_data, user_jwt=token)
         
         if not contract:
-            # If contract creation failed, try to clean up the uploaded file
-            try:
-                blob_service.delete_file(blob_result['url'])
-            except:
-                pass
+            # If contract creation failed, clean up the uploaded file in
+            # the background; the failed response shouldn't wait on it
+            _cleanup_pool.submit(_delete_blob_quietly, blob_result['url'])
             return jsonify({
                 'success': False,
                 'error': 'Failed to create contract record'
             }), 500
         
-        logger.info(f"Contract uploaded successfully: {contract['id']}")
-        
+        logger.info("Contract uploaded successfully: %s", contract['id'])
+        _invalidate_stats(g.user_id)
+
         return jsonify({
             'success': True,
             'data': {
@@ -127,7 +221,7 @@ def upload_contract():
         }), 201
         
     except Exception as e:
-        logger.error(f"Error uploading contract: {str(e)}")
+        logger.error("Error uploading contract: %s", e)
         return jsonify({
             'success': False,
             'error': 'Internal server error during file upload'
@@ -145,26 +239,25 @@ def get_contracts():
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 100, type=int), 100)  # Cap at 100
         status = request.args.get('status')
-        
-        # Extract JWT token
-        token = request.headers.get('Authorization').split(' ')[1]
-        
-        # Get contracts for the authenticated user
-        contracts = supabase_service.get_user_contracts(user_jwt=token)
-        
-        # Filter by status if provided
-        if status:
-            contracts = [c for c in contracts if c.get('status') == status]
-        
-        # Sort by created_at descending
-        contracts.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        
-        # Simple pagination
-        total = len(contracts)
-        start = (page - 1) * per_page
-        end = start + per_page
-        paginated_contracts = contracts[start:end]
-        
+
+        # Reject unknown statuses before paying a query that can only
+        # return an empty set
+        if status and status not in VALID_STATUSES:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid status. Must be one of: {", ".join(sorted(VALID_STATUSES))}'
+            }), 400
+
+        token = g.jwt_token
+
+        # Filtering, ordering and pagination happen in Postgres; only the
+        # requested page is fetched
+        paginated_contracts, total = supabase_service.get_user_contracts_page(
+            user_jwt=token, status=status, page=page, per_page=per_page
+        )
+
+        end = page * per_page
+
         return jsonify({
             'success': True,
             'data': {
@@ -181,7 +274,7 @@ def get_contracts():
         }), 200
         
     except Exception as e:
-        logger.error(f"Error fetching contracts: {str(e)}")
+        logger.error("Error fetching contracts: %s", e)
         return jsonify({
             'success': False,
             'error': 'Internal server error'
@@ -194,8 +287,7 @@ def get_contract(contract_id):
     Get details of a specific contract.
     """
     try:
-        # Extract JWT token
-        token = request.headers.get('Authorization').split(' ')[1]
+        token = g.jwt_token
         
         contract = supabase_service.get_contract_by_id(contract_id, user_jwt=token)
         
@@ -211,7 +303,7 @@ def get_contract(contract_id):
         }), 200
         
     except Exception as e:
-        logger.error(f"Error fetching contract {contract_id}: {str(e)}")
+        logger.error("Error fetching contract %s: %s", contract_id, e)
         return jsonify({
             'success': False,
             'error': 'Internal server error'
@@ -225,8 +317,7 @@ def analyze_contract(contract_id):
     Request body: {"analysis_type": "small_business" | "individual"}
     """
     try:
-        # Extract JWT token
-        token = request.headers.get('Authorization').split(' ')[1]
+        token = g.jwt_token
         
         # Verify user owns the contract
         contract = supabase_service.get_contract_by_id(contract_id, user_jwt=token)
@@ -246,113 +337,106 @@ def analyze_contract(contract_id):
                 'error': 'Invalid analysis type. Must be "small_business" or "individual"'
             }), 400
         
-        # Extract JWT token for audit logging
-        token = request.headers.get('Authorization').split(' ')[1]
-        
-        # Update contract status to processing
-        supabase_service.update_contract(contract_id, {'status': 'processing'}, user_jwt=token)
-        
-        # Download file from Vercel Blob Storage for analysis
-        import requests
-        file_response = requests.get(contract['file_url'])
+        # Download file from Vercel Blob Storage for analysis; the parsers
+        # consume the whole document from memory, so no temp file is needed
+        # (uploads are capped at MAX_FILE_SIZE)
+        file_response = _blob_http.get(contract['file_url'], timeout=60)
         if file_response.status_code != 200:
             return jsonify({
                 'success': False,
                 'error': 'Failed to download contract file for analysis'
             }), 500
+        file_data = file_response.content
+
+        # Reuse the shared analyzer instead of constructing one per request
+        analyzer = _get_analyzer()
+        
+        # Extract text from file
+        logger.info("Extracting text from contract %s", contract_id)
+        text_data = analyzer.extract_text_from_bytes(file_data, contract['original_filename'])
+        
+        # Perform analysis
+        logger.info("Analyzing contract %s with %s analysis", contract_id, analysis_type)
+        analysis_result = analyzer.analyze_contract(
+            text_data['cleaned_text'], 
+            analysis_type
+        )
         
-        # Create temporary file for analysis
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(contract['original_filename'])[1]) as temp_file:
-            temp_file.write(file_response.content)
-            temp_file_path = temp_file.name
+        # Create analysis record
+        analysis_data = {
+            'contract_id': contract_id,
+            'ai_model_used': analysis_result['ai_model_used'],
+            'analysis_type': analysis_type,
+            'risk_score': analysis_result['risk_score'],
+            'risk_level': analysis_result['risk_level'] if isinstance(analysis_result['risk_level'], str) else str(analysis_result['risk_level']),
+            'analysis_results': analysis_result['analysis_results'],  # Supabase handles JSON automatically
+            'processing_time_ms': analysis_result['processing_time_ms'],
+            'tokens_used': analysis_result['tokens_used'],
+            'status': 'completed'
+        }
+
+        analysis = supabase_service.create_analysis(analysis_data, user_jwt=token)
         
-        try:
-            # Initialize analyzer
-            analyzer = ContractAnalyzer()
-            
-            # Extract text from file
-            logger.info(f"Extracting text from contract {contract_id}")
-            text_data = analyzer.extract_text_from_file(temp_file_path)
-            
-            # Perform analysis
-            logger.info(f"Analyzing contract {contract_id} with {analysis_type} analysis")
-            analysis_result = analyzer.analyze_contract(
-                text_data['cleaned_text'], 
-                analysis_type
-            )
-            
-            # Create analysis record
-            analysis_data = {
-                'contract_id': contract_id,
-                'ai_model_used': analysis_result['ai_model_used'],
-                'analysis_type': analysis_type,
-                'risk_score': analysis_result['risk_score'],
-                'risk_level': analysis_result['risk_level'] if isinstance(analysis_result['risk_level'], str) else str(analysis_result['risk_level']),
-                'analysis_results': analysis_result['analysis_results'],  # Supabase handles JSON automatically
-                'processing_time_ms': analysis_result['processing_time_ms'],
-                'tokens_used': analysis_result['tokens_used'],
-                'status': 'completed'
+        if not analysis:
+            raise Exception("Failed to create analysis record")
+        
+        # Extract and save risk factors
+        risk_factors = analyzer.extract_risk_factors(analysis_result['analysis_results'])
+        
+        risk_factor_records = [
+            {
+                'analysis_id': analysis['id'],
+                'category': factor_data['category'],
+                'severity': factor_data['severity'],
+                'description': factor_data['description'],
+                'recommendation': factor_data['recommendation']
             }
+            for factor_data in risk_factors
+        ]
+
+        # Extract contract type from analysis results
+        contract_type = analysis_result['analysis_results'].get('contract_type', 'Unknown')
+
+        # The risk-factor insert and the contract status/type update
+        # are independent writes; issue them concurrently so the
+        # handler pays one round-trip of latency instead of two
+        writes = []
+        if risk_factor_records:
+            writes.append(_io_pool.submit(
+                supabase_service.create_risk_factors, risk_factor_records, token
+            ))
+        writes.append(_io_pool.submit(
+            supabase_service.update_contract, contract_id,
+            {'status': 'analyzed', 'contract_type': contract_type}, token,
+            False  # updated row isn't used; skip the echo
+        ))
+        for write in writes:
+            write.result()
+
+        logger.info("Contract analysis completed for contract %s, type: %s", contract_id, contract_type)
+        _invalidate_stats(g.user_id)
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'analysis_id': analysis['id'],
+                'contract_id': contract_id,
+                'risk_score': analysis['risk_score'],
+                'risk_level': analysis['risk_level'],
+                'status': 'completed',
+                'processing_time_ms': analysis['processing_time_ms']
+            },
+            'message': 'Contract analysis completed successfully'
+        }), 200
 
-            analysis = supabase_service.create_analysis(analysis_data, user_jwt=token)
-            
-            if not analysis:
-                raise Exception("Failed to create analysis record")
-            
-            # Extract and save risk factors
-            risk_factors = analyzer.extract_risk_factors(analysis_result['analysis_results'])
-            
-            risk_factor_records = []
-            for factor_data in risk_factors:
-                risk_factor_records.append({
-                    'analysis_id': analysis['id'],
-                    'category': factor_data['category'],
-                    'severity': factor_data['severity'],
-                    'description': factor_data['description'],
-                    'recommendation': factor_data['recommendation']
-                })
-            
-            if risk_factor_records:
-                supabase_service.create_risk_factors(risk_factor_records, user_jwt=token)
-            
-            # Extract contract type from analysis results and update contract
-            contract_type = analysis_result['analysis_results'].get('contract_type', 'Unknown')
-            
-            # Update contract status and type
-            supabase_service.update_contract(contract_id, {
-                'status': 'analyzed',
-                'contract_type': contract_type
-            }, user_jwt=token)
-
-            logger.info(f"Contract analysis completed for contract {contract_id}, type: {contract_type}")
-            
-            return jsonify({
-                'success': True,
-                'data': {
-                    'analysis_id': analysis['id'],
-                    'contract_id': contract_id,
-                    'risk_score': analysis['risk_score'],
-                    'risk_level': analysis['risk_level'],
-                    'status': 'completed',
-                    'processing_time_ms': analysis['processing_time_ms']
-                },
-                'message': 'Contract analysis completed successfully'
-            }), 200
-            
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
-        
     except Exception as e:
-        logger.error(f"Error analyzing contract {contract_id}: {str(e)}")
+        logger.error("Error analyzing contract %s: %s", contract_id, e)
         
         # Update contract status to error
         try:
-            token = request.headers.get('Authorization').split(' ')[1]
-            supabase_service.update_contract(contract_id, {'status': 'error'}, user_jwt=token)
+            token = g.jwt_token
+            supabase_service.update_contract(contract_id, {'status': 'error'}, user_jwt=token,
+                                             return_row=False)
         except:
             pass
         
@@ -368,35 +452,27 @@ def get_contract_analysis(contract_id):
     Get the latest analysis results for a contract.
     """
     try:
-        # Extract JWT token
-        token = request.headers.get('Authorization').split(' ')[1]
-        
-        # Verify user owns the contract
-        if not supabase_service.verify_user_owns_contract(contract_id, user_jwt=token):
-            return jsonify({
-                'success': False,
-                'error': 'Contract not found'
-            }), 404
-        
-        # Get analyses for this contract
-        analyses = supabase_service.get_contract_analyses(contract_id, user_jwt=token)
-        
-        if not analyses:
+        token = g.jwt_token
+
+        # No ownership preflight: RLS scopes the query to the caller, so
+        # another user's contract simply has no visible analyses
+        # Fetch only the most recent analysis instead of every analysis
+        # for the contract
+        latest_analysis = supabase_service.get_latest_analysis(contract_id, user_jwt=token)
+
+        if not latest_analysis:
             return jsonify({
                 'success': False,
                 'error': 'No analysis found for this contract'
             }), 404
-        
-        # Return the most recent analysis (first in the list due to ordering)
-        latest_analysis = analyses[0]
-        
+
         return jsonify({
             'success': True,
             'data': latest_analysis
         }), 200
         
     except Exception as e:
-        logger.error(f"Error fetching analysis for contract {contract_id}: {str(e)}")
+        logger.error("Error fetching analysis for contract %s: %s", contract_id, e)
         return jsonify({
             'success': False,
             'error': 'Internal server error'
@@ -409,16 +485,10 @@ def get_specific_analysis(contract_id, analysis_id):
     Get a specific analysis by ID.
     """
     try:
-        # Extract JWT token
-        token = request.headers.get('Authorization').split(' ')[1]
-        
-        # Verify user owns the contract
-        if not supabase_service.verify_user_owns_contract(contract_id, user_jwt=token):
-            return jsonify({
-                'success': False,
-                'error': 'Contract not found'
-            }), 404
-        
+        token = g.jwt_token
+
+        # No ownership preflight: RLS hides other users' analyses, and the
+        # contract_id check below rejects mismatched paths
         analysis = supabase_service.get_analysis_by_id(analysis_id, user_jwt=token)
         
         if not analysis or analysis['contract_id'] != contract_id:
@@ -433,7 +503,7 @@ def get_specific_analysis(contract_id, analysis_id):
         }), 200
         
     except Exception as e:
-        logger.error(f"Error fetching analysis {analysis_id}: {str(e)}")
+        logger.error("Error fetching analysis %s: %s", analysis_id, e)
         return jsonify({
             'success': False,
             'error': 'Internal server error'
@@ -446,8 +516,7 @@ def delete_contract(contract_id):
     Delete a contract and its associated files and analyses.
     """
     try:
-        # Extract JWT token
-        token = request.headers.get('Authorization').split(' ')[1]
+        token = g.jwt_token
         
         # Get contract to verify ownership and get file URL
         contract = supabase_service.get_contract_by_id(contract_id, user_jwt=token)
@@ -457,30 +526,30 @@ def delete_contract(contract_id):
                 'error': 'Contract not found'
             }), 404
         
-        # Delete the file from Vercel Blob Storage
-        try:
-            blob_service.delete_file(contract['file_url'])
-        except Exception as e:
-            logger.warning(f"Could not delete file {contract['file_url']}: {str(e)}")
-        
-        # Delete from Supabase (cascades to analyses and risk factors due to foreign key constraints)
+        # Delete from Supabase first (cascades to analyses and risk factors
+        # due to foreign key constraints)
         success = supabase_service.delete_contract(contract_id, user_jwt=token)
-        
+
         if not success:
             return jsonify({
                 'success': False,
                 'error': 'Failed to delete contract'
             }), 500
-        
-        logger.info(f"Contract {contract_id} deleted successfully")
-        
+
+        # Remove the blob in the background; the client doesn't need to
+        # wait on the storage round-trip
+        _cleanup_pool.submit(_delete_blob_quietly, contract['file_url'])
+
+        logger.info("Contract %s deleted successfully", contract_id)
+        _invalidate_stats(g.user_id)
+
         return jsonify({
             'success': True,
             'message': 'Contract deleted successfully'
         }), 200
         
     except Exception as e:
-        logger.error(f"Error deleting contract {contract_id}: {str(e)}")
+        logger.error("Error deleting contract %s: %s", contract_id, e)
         return jsonify({
             'success': False,
             'error': 'Internal server error'
@@ -494,8 +563,7 @@ def batch_update_contract_types():
     This is useful for retroactively updating contracts analyzed before the contract_type fix.
     """
     try:
-        # Extract JWT token
-        token = request.headers.get('Authorization').split(' ')[1]
+        token = g.jwt_token
         
         # Get all analyzed contracts for the user that don't have a contract_type
         contracts = supabase_service.get_user_contracts(user_jwt=token)
@@ -517,19 +585,23 @@ def batch_update_contract_types():
         
         updated_count = 0
         errors = []
-        
+
+        # Fetch the newest analysis for every candidate in one query
+        # instead of one round-trip per contract
+        latest_by_contract = supabase_service.get_latest_analyses_for_contracts(
+            [c['id'] for c in contracts_to_update], user_jwt=token
+        )
+
         for contract in contracts_to_update:
             try:
-                # Get the latest analysis for this contract
-                analyses = supabase_service.get_contract_analyses(contract['id'], user_jwt=token)
-                
-                if not analyses:
+                latest_analysis = latest_by_contract.get(contract['id'])
+
+                if not latest_analysis:
                     errors.append(f"No analysis found for contract {contract['id']}")
                     continue
-                
+
                 # Get contract type from the latest analysis
-                latest_analysis = analyses[0]
-                analysis_results = latest_analysis.get('analysis_results', {})
+                analysis_results = latest_analysis.get('analysis_results') or {}
                 contract_type = analysis_results.get('contract_type', 'Unknown')
                 
                 # Update the contract with the extracted type
@@ -539,7 +611,7 @@ def batch_update_contract_types():
                 
                 if success:
                     updated_count += 1
-                    logger.info(f"Updated contract {contract['id']} with type: {contract_type}")
+                    logger.info("Updated contract %s with type: %s", contract['id'], contract_type)
                 else:
                     errors.append(f"Failed to update contract {contract['id']}")
                     
@@ -558,7 +630,7 @@ def batch_update_contract_types():
             response_data['errors'] = errors
             response_data['message'] += f' ({len(errors)} errors occurred)'
         
-        logger.info(f"Batch contract type update completed: {updated_count}/{len(contracts_to_update)} updated")
+        logger.info("Batch contract type update completed: %s/%s updated", updated_count, len(contracts_to_update))
         
         return jsonify({
             'success': True,
@@ -566,7 +638,7 @@ def batch_update_contract_types():
         }), 200
         
     except Exception as e:
-        logger.error(f"Error in batch contract type update: {str(e)}")
+        logger.error("Error in batch contract type update: %s", e)
         return jsonify({
             'success': False,
             'error': 'Internal server error during batch update'
@@ -579,58 +651,78 @@ def get_dashboard_stats():
     Get dashboard statistics for the authenticated user.
     """
     try:
-        # Extract JWT token
-        token = request.headers.get('Authorization').split(' ')[1]
-        
-        # Get all contracts for the user
-        contracts = supabase_service.get_user_contracts(user_jwt=token)
-        
-        # Calculate statistics
-        total_contracts = len(contracts)
-        
-        # Get contracts by status
-        status_counts = {}
-        for contract in contracts:
-            status = contract.get('status', 'unknown')
-            status_counts[status] = status_counts.get(status, 0) + 1
-        
-        # Get all analyses for user's contracts
-        all_analyses = []
-        for contract in contracts:
-            analyses = supabase_service.get_contract_analyses(contract['id'], user_jwt=token)
-            all_analyses.extend(analyses)
-        
-        # Calculate risk distribution
-        risk_counts = {'high_risk': 0, 'medium_risk': 0, 'low_risk': 0}
-        for analysis in all_analyses:
-            risk_level = analysis.get('risk_level', '').lower()
-            if risk_level == 'high':
-                risk_counts['high_risk'] += 1
-            elif 'medium' in risk_level:  # Covers Medium, Medium-High, Medium-Low
-                risk_counts['medium_risk'] += 1
-            elif risk_level == 'low':
-                risk_counts['low_risk'] += 1
-        
-        # Get recent activity (last 5 contracts)
-        recent_contracts = sorted(contracts, key=lambda x: x.get('created_at', ''), reverse=True)[:5]
-        
+        # Serve recent results from the per-user cache when available
+        cached_stats = _get_cached_stats(g.user_id)
+        if cached_stats is not None:
+            return jsonify({
+                'success': True,
+                'data': cached_stats
+            }), 200
+
+        token = g.jwt_token
+
+        # Fast path: the counts come back pre-aggregated from a single SQL
+        # function call, leaving only a small query for recent activity
+        counts = supabase_service.get_dashboard_counts(user_jwt=token)
+        if counts:
+            total_contracts = counts.get('total_contracts', 0)
+            status_counts = counts.get('status_breakdown') or {}
+            risk_counts = {'high_risk': 0, 'medium_risk': 0, 'low_risk': 0}
+            for risk_level, count in (counts.get('risk_levels') or {}).items():
+                bucket = _RISK_BUCKET.get(risk_level.lower())
+                if bucket:
+                    risk_counts[bucket] += count
+
+            # Recent activity (last 5 contracts)
+            recent_contracts, _ = supabase_service.get_user_contracts_page(
+                user_jwt=token, page=1, per_page=5
+            )
+        else:
+            # Fallback when the SQL function isn't deployed yet: compute
+            # the counts from the full contract and analysis lists
+            contracts = supabase_service.get_user_contracts(user_jwt=token)
+            total_contracts = len(contracts)
+
+            status_counts = Counter(c.get('status', 'unknown') for c in contracts)
+
+            # Get all analyses for user's contracts in one query instead of
+            # one round-trip per contract; only risk_level is needed, so
+            # the analysis_results JSONB stays out of the response
+            contract_ids = [contract['id'] for contract in contracts]
+            all_analyses = supabase_service.get_analyses_for_contracts(
+                contract_ids, user_jwt=token, columns="contract_id, risk_level"
+            )
+
+            risk_counts = {'high_risk': 0, 'medium_risk': 0, 'low_risk': 0}
+            for analysis in all_analyses:
+                bucket = _RISK_BUCKET.get((analysis.get('risk_level') or '').lower())
+                if bucket:
+                    risk_counts[bucket] += 1
+
+            # Get recent activity (last 5 contracts) without sorting the
+            # whole list just to take the top of it
+            recent_contracts = heapq.nlargest(5, contracts, key=lambda x: x.get('created_at', ''))
+
+        stats = {
+            'total_contracts': total_contracts,
+            'status_breakdown': {
+                'uploaded': status_counts.get('uploaded', 0),
+                'processing': status_counts.get('processing', 0),
+                'analyzed': status_counts.get('analyzed', 0),
+                'error': status_counts.get('error', 0)
+            },
+            'risk_distribution': risk_counts,
+            'recent_activity': recent_contracts
+        }
+        _set_cached_stats(g.user_id, stats)
+
         return jsonify({
             'success': True,
-            'data': {
-                'total_contracts': total_contracts,
-                'status_breakdown': {
-                    'uploaded': status_counts.get('uploaded', 0),
-                    'processing': status_counts.get('processing', 0),
-                    'analyzed': status_counts.get('analyzed', 0),
-                    'error': status_counts.get('error', 0)
-                },
-                'risk_distribution': risk_counts,
-                'recent_activity': recent_contracts
-            }
+            'data': stats
         }), 200
         
     except Exception as e:
-        logger.error(f"Error fetching dashboard stats: {str(e)}")
+        logger.error("Error fetching dashboard stats: %s", e)
         return jsonify({
             'success': False,
             'error': 'Internal server error'
@@ -2,8 +2,6 @@ from flask import Blueprint, jsonify, request, g
 from src.middleware.auth import require_auth, get_current_user
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 user_bp = Blueprint('user', __name__)
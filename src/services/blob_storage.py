@@ -1,25 +1,49 @@
+import logging
 import os
 import uuid
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter, Retry
 from typing import Optional, Dict, Any
 import mimetypes
 
+logger = logging.getLogger(__name__)
+
 class VercelBlobService:
     def __init__(self):
         self.token = os.getenv("BLOB_READ_WRITE_TOKEN")
         if not self.token:
             raise ValueError("BLOB_READ_WRITE_TOKEN must be set in environment variables")
         self.base_url = "https://blob.vercel-storage.com"
+
+        # One pooled session for all blob operations: keep-alive skips the
+        # TCP+TLS handshake per call, and the auth header is set once
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {self.token}"
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=2, backoff_factor=0.2,
+                              status_forcelist=(500, 502, 503, 504))
+        )
+        self.session.mount("https://", adapter)
+
+        # Last seen ETag and parsed body per URL, so unchanged resources
+        # come back as 0-byte 304s instead of full responses
+        self._etag_cache = {}
     
-    def upload_file(self, file_content: bytes, filename: str, content_type: str = None) -> Optional[Dict[str, Any]]:
+    def upload_file(self, file_content, filename: str, content_type: str = None, size: int = None) -> Optional[Dict[str, Any]]:
         """
         Upload file to Vercel Blob Storage and return file info
-        
+
         Args:
-            file_content: The file content as bytes
+            file_content: The file content as bytes or a readable file-like
+                object; file-like objects are streamed without buffering
+                the whole file in memory
             filename: Original filename
             content_type: MIME type of the file
-            
+            size: File size in bytes, if known (used when streaming)
+
         Returns:
             Dict with url, pathname, contentType, contentDisposition if successful, None otherwise
         """
@@ -34,18 +58,21 @@ class VercelBlobService:
                 if not content_type:
                     content_type = 'application/octet-stream'
             
-            # Prepare headers
+            # Prepare per-request headers (auth lives on the session)
             headers = {
-                "Authorization": f"Bearer {self.token}",
                 "Content-Type": content_type,
                 "x-content-type": content_type,
                 "x-add-random-suffix": "1"  # Let Vercel add random suffix for uniqueness
             }
-            
+            # With an explicit length, requests streams file-like bodies
+            # as-is instead of falling back to chunked transfer encoding
+            if size is not None:
+                headers["Content-Length"] = str(size)
+
             # Upload to Vercel Blob Storage
             upload_url = f"{self.base_url}/{filename}"  # Use original filename, Vercel will make it unique
-            
-            response = requests.put(
+
+            response = self.session.put(
                 upload_url,
                 data=file_content,
                 headers=headers
@@ -58,14 +85,15 @@ class VercelBlobService:
                     'pathname': result.get('pathname'),
                     'content_type': result.get('contentType', content_type),
                     'content_disposition': result.get('contentDisposition'),
-                    'size': len(file_content)
+                    'size': size if size is not None else len(file_content)
                 }
             else:
-                print(f"Upload failed with status {response.status_code}: {response.text}")
+                logger.warning("Upload failed with status %s: %s",
+                               response.status_code, response.text[:256])
                 return None
-                
-        except Exception as e:
-            print(f"Error uploading file to Vercel Blob: {e}")
+
+        except Exception:
+            logger.exception("Error uploading file to Vercel Blob")
             return None
     
     def delete_file(self, file_url: str) -> bool:
@@ -79,19 +107,36 @@ class VercelBlobService:
             True if successful, False otherwise
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {self.token}"
-            }
-            
             # For deletion, we need to use the DELETE method on the file URL
-            response = requests.delete(file_url, headers=headers)
+            response = self.session.delete(file_url)
             
             return response.status_code in [200, 204, 404]  # 404 means already deleted
-            
-        except Exception as e:
-            print(f"Error deleting file from Vercel Blob: {e}")
+
+        except Exception:
+            logger.exception("Error deleting file from Vercel Blob")
             return False
-    
+
+    def delete_many(self, file_urls: list) -> list:
+        """
+        Delete several files concurrently.
+
+        Vercel Blob has no batch-delete API, so the deletes are issued
+        in parallel over the pooled session instead of one TLS
+        round-trip at a time.
+
+        Args:
+            file_urls: URLs of the files to delete
+
+        Returns:
+            List of per-URL booleans in input order
+        """
+        if not file_urls:
+            return []
+        if len(file_urls) == 1:
+            return [self.delete_file(file_urls[0])]
+        with ThreadPoolExecutor(max_workers=min(8, len(file_urls))) as executor:
+            return list(executor.map(self.delete_file, file_urls))
+
     def get_file_info(self, file_url: str) -> Optional[Dict[str, Any]]:
         """
         Get file information from Vercel Blob Storage
@@ -103,25 +148,32 @@ class VercelBlobService:
             Dict with file info if successful, None otherwise
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {self.token}"
-            }
-            
-            response = requests.head(file_url, headers=headers)
-            
+            headers = {}
+            cached = self._etag_cache.get(file_url)
+            if cached:
+                headers["If-None-Match"] = cached[0]
+
+            response = self.session.head(file_url, headers=headers)
+
+            if response.status_code == 304 and cached:
+                return cached[1]
+
             if response.status_code == 200:
-                return {
+                info = {
                     'url': file_url,
                     'content_type': response.headers.get('content-type'),
                     'content_length': response.headers.get('content-length'),
                     'last_modified': response.headers.get('last-modified'),
                     'etag': response.headers.get('etag')
                 }
-            
+                if info['etag']:
+                    self._etag_cache[file_url] = (info['etag'], info)
+                return info
+
             return None
             
-        except Exception as e:
-            print(f"Error getting file info from Vercel Blob: {e}")
+        except Exception:
+            logger.exception("Error getting file info from Vercel Blob")
             return None
     
     def generate_signed_url(self, file_url: str, expires_in: int = 3600) -> Optional[str]:
@@ -150,24 +202,32 @@ class VercelBlobService:
             List of file info dicts if successful, None otherwise
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {self.token}"
-            }
-            
             # This endpoint might not be available in all Vercel Blob plans
             list_url = f"{self.base_url}/"
             if prefix:
                 list_url += f"?prefix={prefix}"
-            
-            response = requests.get(list_url, headers=headers)
-            
+
+            headers = {}
+            cached = self._etag_cache.get(list_url)
+            if cached:
+                headers["If-None-Match"] = cached[0]
+
+            response = self.session.get(list_url, headers=headers)
+
+            if response.status_code == 304 and cached:
+                return cached[1]
+
             if response.status_code == 200:
-                return response.json().get('blobs', [])
-            
+                blobs = response.json().get('blobs', [])
+                etag = response.headers.get('etag')
+                if etag:
+                    self._etag_cache[list_url] = (etag, blobs)
+                return blobs
+
             return None
             
-        except Exception as e:
-            print(f"Error listing files from Vercel Blob: {e}")
+        except Exception:
+            logger.exception("Error listing files from Vercel Blob")
             return None
 
 # Global instance
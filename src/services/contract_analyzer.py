@@ -1,6 +1,11 @@
+import hashlib
+import io
+from bisect import bisect_left
 import os
 import json
 import json5
+import orjson
+import threading
 import time
 import fitz  # PyMuPDF
 import re # Import regex module
@@ -9,7 +14,8 @@ from openai import OpenAI
 from typing import Dict, List, Optional, Tuple
 import logging
 import pprint
-from .prompts import SMALL_BUSINESS_ANALYSIS_PROMPT, INDIVIDUAL_PROMPT
+from concurrent.futures import ThreadPoolExecutor
+from .prompts import build_small_business_prompt, build_individual_prompt
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +28,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Prompt assembly lives in prompts.py next to the templates; this maps
+# each analysis type to its builder
+_PROMPT_BUILDERS = {
+    'small_business': build_small_business_prompt,
+    'individual': build_individual_prompt,
+}
+
+# Below this page count the serial path wins; thread startup costs more
+# than it saves on small documents
+_PDF_PARALLEL_MIN_PAGES = 8
+
+# Identical text analyzed with the same model and type returns the
+# cached result instead of paying for another model call
+_ANALYSIS_CACHE_TTL_SECONDS = 24 * 3600
+_ANALYSIS_CACHE_MAX_ENTRIES = 128
+
+# Analysis type decides the model; anything unrecognized gets the
+# cheaper lite model
+_MODEL_BY_TYPE = {
+    'small_business': 'google/gemini-2.5-flash',
+    'individual': 'google/gemini-2.5-flash-lite',
+}
+_DEFAULT_MODEL = 'google/gemini-2.5-flash-lite'
+
+# Risk level lookup: scores <= threshold map to the level at the same
+# index; anything above the last threshold is High
+_RISK_THRESHOLDS = (15, 35, 65, 85)
+_RISK_LEVELS = ("Low", "Medium-Low", "Medium", "Medium-High", "High")
+
+# Compiled once; _clean_text runs on every extracted contract
+_WS_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\S+")
+_PDF_ARTIFACTS = str.maketrans({
+    '\x0c': ' ',  # Form feed
+    '\xa0': ' ',  # Non-breaking space
+})
+
+def _count_words(text: str) -> int:
+    """Count words without allocating a token list like str.split does"""
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
 class ContractAnalyzer:
     def __init__(self):
         self.client = OpenAI(
@@ -40,6 +87,10 @@ class ContractAnalyzer:
             'enforceability_risk': 0.05
         }
         
+        # Content-addressed result cache; keyed on text+model+type hash
+        self._analysis_cache = {}
+        self._analysis_cache_lock = threading.Lock()
+
         # Model selection thresholds
         self.model_selection = {
             'google/gemini-2.5-flash': {
@@ -75,42 +126,121 @@ class ContractAnalyzer:
             logger.error(f"Error extracting text from {file_path}: {str(e)}")
             raise
 
+    def extract_text_from_bytes(self, data: bytes, filename: str) -> Dict[str, any]:
+        """
+        Extract text content from an in-memory contract file.
+        Same formats as extract_text_from_file, without a temp-file round trip.
+        """
+        try:
+            file_extension = os.path.splitext(filename)[1].lower()
+
+            if file_extension == '.pdf':
+                return self._extract_from_pdf_bytes(data)
+            elif file_extension in ['.docx', '.doc']:
+                return self._extract_from_docx_document(Document(io.BytesIO(data)))
+            elif file_extension == '.txt':
+                return self._build_txt_result(data.decode('utf-8'))
+            else:
+                raise ValueError(f"Unsupported file format: {file_extension}")
+
+        except Exception as e:
+            logger.error(f"Error extracting text from {filename}: {str(e)}")
+            raise
+
     def _extract_from_pdf(self, file_path: str) -> Dict[str, any]:
         """Extract text from PDF using PyMuPDF"""
-        document = fitz.open(file_path)
-        text_content = []
-        
-        for page_num in range(len(document)):
-            page = document.load_page(page_num)
-            text_content.append(page.get_text())
-        
+        return self._extract_from_pdf_document(fitz.open(file_path))
+
+    def _extract_from_pdf_bytes(self, data: bytes) -> Dict[str, any]:
+        """Extract text from in-memory PDF bytes, in parallel when large.
+
+        PyMuPDF documents must not be shared across threads, so for
+        large PDFs each worker opens its own document from the same
+        bytes and extracts a contiguous slice of pages. get_text
+        releases the GIL, so the slices overlap across cores.
+        """
+        document = fitz.open(stream=data, filetype='pdf')
+        page_count = document.page_count
+        if page_count < _PDF_PARALLEL_MIN_PAGES:
+            return self._extract_from_pdf_document(document)
+        document.close()
+
+        workers = min(8, os.cpu_count() or 1)
+        step = -(-page_count // workers)  # ceil division
+        ranges = [(start, min(start + step, page_count))
+                  for start in range(0, page_count, step)]
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            parts = list(executor.map(
+                lambda bounds: self._page_slice_text(data, *bounds), ranges))
+
+        raw_text = ''.join(parts)
+
+        logger.info(f"Extracted text from PDF:\n{raw_text}")
+        return {
+            'raw_text': raw_text,
+            'cleaned_text': self._clean_text(raw_text),
+            'page_count': page_count,
+            'word_count': sum(_count_words(part) for part in parts),
+            'char_count': len(raw_text)
+        }
+
+    def _page_slice_text(self, data: bytes, start: int, stop: int) -> str:
+        """Extract text for a page range using a thread-local document"""
+        document = fitz.open(stream=data, filetype='pdf')
+        try:
+            return ''.join(document.load_page(page_num).get_text() + '\n'
+                           for page_num in range(start, stop))
+        finally:
+            document.close()
+
+    def _extract_from_pdf_document(self, document) -> Dict[str, any]:
+        """Extract text from an open PyMuPDF document"""
+        # Single pass over the pages: stream into one buffer and count
+        # words as we go instead of re-splitting the joined text later
+        buf = io.StringIO()
+        page_count = document.page_count
+        word_count = 0
+
+        for page in document:
+            text = page.get_text()
+            buf.write(text)
+            buf.write("\n")
+            word_count += _count_words(text)
+
         document.close()
-        raw_text = "\n".join(text_content)
+        raw_text = buf.getvalue()
 
         logger.info(f"Extracted text from PDF:\n{raw_text}")
         return {
             'raw_text': raw_text,
             'cleaned_text': self._clean_text(raw_text),
-            'page_count': len(text_content),
-            'word_count': len(raw_text.split()),
+            'page_count': page_count,
+            'word_count': word_count,
             'char_count': len(raw_text)
         }
 
     def _extract_from_docx(self, file_path: str) -> Dict[str, any]:
         """Extract text from DOCX using python-docx"""
-        doc = Document(file_path)
-        text_content = []
-        
+        return self._extract_from_docx_document(Document(file_path))
+
+    def _extract_from_docx_document(self, doc) -> Dict[str, any]:
+        """Extract text from an open python-docx document"""
+        buf = io.StringIO()
+        word_count = 0
+
         for paragraph in doc.paragraphs:
-            text_content.append(paragraph.text)
-        
-        raw_text = "\n".join(text_content)
-        
+            text = paragraph.text
+            buf.write(text)
+            buf.write("\n")
+            word_count += _count_words(text)
+
+        raw_text = buf.getvalue()
+
         return {
             'raw_text': raw_text,
             'cleaned_text': self._clean_text(raw_text),
             'page_count': 1,  # DOCX doesn't have clear page breaks
-            'word_count': len(raw_text.split()),
+            'word_count': word_count,
             'char_count': len(raw_text)
         }
 
@@ -118,39 +248,33 @@ class ContractAnalyzer:
         """Extract text from TXT file"""
         with open(file_path, 'r', encoding='utf-8') as file:
             raw_text = file.read()
-        
+
+        return self._build_txt_result(raw_text)
+
+    def _build_txt_result(self, raw_text: str) -> Dict[str, any]:
+        """Build the extraction result for plain text content"""
         return {
             'raw_text': raw_text,
             'cleaned_text': self._clean_text(raw_text),
             'page_count': 1,
-            'word_count': len(raw_text.split()),
+            'word_count': _count_words(raw_text),
             'char_count': len(raw_text)
         }
 
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text content"""
-        # Remove excessive whitespace
-        cleaned = ' '.join(text.split())
-        
-        # Remove common PDF artifacts
-        cleaned = cleaned.replace('\x0c', ' ')  # Form feed
-        cleaned = cleaned.replace('\xa0', ' ')  # Non-breaking space
-        
-        return cleaned
+        # Map PDF artifacts to spaces, then collapse whitespace runs —
+        # two C-level passes instead of split/join plus two replaces
+        return _WS_RE.sub(' ', text.translate(_PDF_ARTIFACTS)).strip()
 
     def select_ai_model(self, text_length: int, analysis_type: str) -> str:
         """
         Select the appropriate AI model based on text length and analysis requirements.
         """
-        # Estimate tokens (rough approximation: 1 token ≈ 4 characters)
-        estimated_tokens = text_length / 4
-        
-        if analysis_type == "small_business":
-            return "google/gemini-2.5-flash"
-        elif analysis_type == "individual":
-            return "google/gemini-2.5-flash-lite"
-        else:
-            return "google/gemini-2.5-flash-lite"
+        # Selection is driven by analysis type; both Gemini models have
+        # context windows far beyond any contract we accept, so no token
+        # estimate is needed here
+        return _MODEL_BY_TYPE.get(analysis_type, _DEFAULT_MODEL)
 
     def analyze_contract(self, contract_text: str, analysis_type: str) -> Dict[str, any]:
         """
@@ -161,7 +285,15 @@ class ContractAnalyzer:
         try:
             # Select appropriate model
             model = self.select_ai_model(len(contract_text), analysis_type)
-            
+
+            # Re-uploads of unchanged text are common (tweak, resubmit);
+            # a content hash hit skips the model round-trip entirely
+            cache_key = self._analysis_cache_key(contract_text, model, analysis_type)
+            cached = self._get_cached_analysis(cache_key)
+            if cached is not None:
+                logger.info("Analysis cache hit for %s; skipping model call", model)
+                return dict(cached)
+
             # Prepare the analysis prompt
             prompt = self._get_analysis_prompt(contract_text, analysis_type)
             
@@ -179,7 +311,10 @@ class ContractAnalyzer:
                     }
                 ],
                 temperature=0.1,  # Low temperature for consistent, factual responses
-                max_tokens=4000
+                max_tokens=4000,
+                # Ask for JSON mode so the model skips markdown fences;
+                # OpenRouter passes this through where the model supports it
+                response_format={"type": "json_object"}
             )
             
             # Parse the response
@@ -190,9 +325,9 @@ class ContractAnalyzer:
             
             # Try to parse as JSON, fallback to structured text
             try:
-                analysis_results = json.loads(analysis_content)
+                analysis_results = orjson.loads(analysis_content)
                 logger.info(f"Successfully parsed JSON response from model")
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 logger.warning(f"Failed to parse JSON from model response, falling back to text parsing")
                 # If not valid JSON, create structured response
                 analysis_results = self._parse_text_response(analysis_content)
@@ -209,7 +344,7 @@ class ContractAnalyzer:
             # Log the analysis results summary
             self._log_analysis_results(analysis_results, risk_score, risk_level)
             
-            return {
+            result = {
                 'analysis_results': analysis_results,
                 'risk_score': risk_score,
                 'risk_level': risk_level,
@@ -217,21 +352,45 @@ class ContractAnalyzer:
                 'processing_time_ms': processing_time,
                 'tokens_used': response.usage.total_tokens if response.usage else 0
             }
-            
+            self._set_cached_analysis(cache_key, result)
+            return result
+
         except Exception as e:
             logger.error(f"Error in contract analysis: {str(e)}")
             raise
 
+    def _analysis_cache_key(self, contract_text: str, model: str, analysis_type: str) -> str:
+        """Content-addressed key for the analysis cache"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(contract_text.encode())
+        digest.update(model.encode())
+        digest.update(analysis_type.encode())
+        return digest.hexdigest()
+
+    def _get_cached_analysis(self, cache_key: str) -> Optional[Dict[str, any]]:
+        with self._analysis_cache_lock:
+            entry = self._analysis_cache.get(cache_key)
+            if entry and entry[0] > time.time():
+                return entry[1]
+        return None
+
+    def _set_cached_analysis(self, cache_key: str, result: Dict[str, any]) -> None:
+        with self._analysis_cache_lock:
+            if len(self._analysis_cache) >= _ANALYSIS_CACHE_MAX_ENTRIES:
+                # Drop the entry closest to expiry rather than tracking LRU order
+                oldest = min(self._analysis_cache, key=lambda k: self._analysis_cache[k][0])
+                del self._analysis_cache[oldest]
+            self._analysis_cache[cache_key] = (time.time() + _ANALYSIS_CACHE_TTL_SECONDS, result)
+
     def _get_analysis_prompt(self, contract_text: str, analysis_type: str) -> str:
         """
         Generate the appropriate analysis prompt based on analysis type.
         """
-        if analysis_type == "small_business":
-            return SMALL_BUSINESS_ANALYSIS_PROMPT.format(contract_text=contract_text)
-        elif analysis_type == "individual":
-            return INDIVIDUAL_PROMPT.format(contract_text=contract_text)
-        else:
+        try:
+            build_prompt = _PROMPT_BUILDERS[analysis_type]
+        except KeyError:
             raise ValueError("Unknown analysis type")
+        return build_prompt(contract_text)
 
     def _parse_text_response(self, response_text: str) -> Dict[str, any]:
         """
@@ -405,16 +564,7 @@ class ContractAnalyzer:
         Convert numeric risk score to risk level category.
         Returns a string representing the risk level.
         """
-        if risk_score <= 15:
-            return "Low"
-        elif risk_score <= 35:
-            return "Medium-Low"
-        elif risk_score <= 65:
-            return "Medium"
-        elif risk_score <= 85:
-            return "Medium-High"
-        else:
-            return "High"
+        return _RISK_LEVELS[bisect_left(_RISK_THRESHOLDS, risk_score)]
 
     def extract_risk_factors(self, analysis_results: Dict[str, any]) -> List[Dict[str, str]]:
         """
@@ -88,4 +88,27 @@ Please provide your analysis in the following JSON structure. ENSURE THE ENTIRE
 Focus on practical concerns for individuals. Highlight potential financial risks, unclear obligations, and missing protections.
 
 Respond ONLY with valid JSON. Do not include any extra text, comments, or markdown. If you cannot provide a value, use null.
-"""
\ No newline at end of file
+"""
+def _split_template(template: str) -> tuple:
+    """Pre-split a template around its {contract_text} placeholder.
+
+    Done once at import, with the format brace escapes resolved, so
+    building a prompt is plain concatenation instead of a .format()
+    scan over the whole multi-KB template per request.
+    """
+    prefix, suffix = template.split('{contract_text}')
+    return (prefix.replace('{{', '{').replace('}}', '}'),
+            suffix.replace('{{', '{').replace('}}', '}'))
+
+_SMALL_BUSINESS_PARTS = _split_template(SMALL_BUSINESS_ANALYSIS_PROMPT)
+_INDIVIDUAL_PARTS = _split_template(INDIVIDUAL_PROMPT)
+
+def build_small_business_prompt(contract_text: str) -> str:
+    """Build the small business analysis prompt around the contract text"""
+    prefix, suffix = _SMALL_BUSINESS_PARTS
+    return prefix + contract_text + suffix
+
+def build_individual_prompt(contract_text: str) -> str:
+    """Build the individual analysis prompt around the contract text"""
+    prefix, suffix = _INDIVIDUAL_PARTS
+    return prefix + contract_text + suffix
@@ -1,49 +1,124 @@
+import hashlib
 import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from postgrest import APIError
 from supabase import create_client, Client
 from typing import Dict, Any, List
 import uuid
 
+@dataclass(frozen=True, slots=True)
+class _SupabaseConfig:
+    """Validated connection settings, read from the environment once"""
+    url: str
+    anon_key: str
+
+def _load_config() -> _SupabaseConfig:
+    url = os.getenv("SUPABASE_URL")
+    anon_key = os.getenv("SUPABASE_ANON_KEY")
+
+    if not url:
+        raise ValueError("SUPABASE_URL must be set in environment variables")
+    if not anon_key:
+        raise ValueError("SUPABASE_ANON_KEY must be set in environment variables")
+    return _SupabaseConfig(url, anon_key)
+
+_CONFIG = _load_config()
+
+@lru_cache(maxsize=256)
+def _build_client(url: str, anon_key: str, user_jwt_token: str) -> Client:
+    """Build (or reuse) a client for a user's JWT.
+
+    create_client assembles the whole postgrest/auth/storage subclient
+    graph with a fresh httpx session — too heavy to repeat for every
+    query. Tokens repeat across the requests of a session, so caching
+    by JWT reuses the client and its warm keep-alive connections;
+    expired tokens simply stop being requested and age out of the LRU.
+    """
+    return create_client(url, anon_key, {
+        'global': {
+            'headers': {
+                'Authorization': f'Bearer {user_jwt_token}'
+            }
+        }
+    })
+
+# Columns the API actually returns for embedded risk factors; skips
+# analysis_id (redundant with the parent row) and the internal user_id
+_RISK_FACTOR_COLUMNS = "risk_factors(id, category, severity, title, description, recommendation, created_at)"
+
+# Bulk inserts are sliced so one request never approaches PostgREST's
+# request-body limit
+_RISK_FACTOR_INSERT_CHUNK = 500
+
+# Ownership decisions repeat many times within a session; confirmed
+# ones are remembered briefly so repeat checks skip the round-trip
+_OWNERSHIP_TTL_SECONDS = 30
+_OWNERSHIP_MAX_ENTRIES = 1024
+_ownership_cache = {}
+_ownership_lock = threading.Lock()
+
 class SupabaseService:
     def __init__(self):
-        self.url = os.getenv("SUPABASE_URL")
-        self.anon_key = os.getenv("SUPABASE_ANON_KEY")
-        
-        if not self.url:
-            raise ValueError("SUPABASE_URL must be set in environment variables")
-        if not self.anon_key:
-            raise ValueError("SUPABASE_ANON_KEY must be set in environment variables")
+        self.url = _CONFIG.url
+        self.anon_key = _CONFIG.anon_key
     
     def get_client(self, user_jwt_token: str) -> Client:
-        """Create a client using the user's JWT token for all operations"""
-        return create_client(self.url, self.anon_key, {
-            'global': {
-                'headers': {
-                    'Authorization': f'Bearer {user_jwt_token}'
-                }
-            }
-        })
+        """Get a client using the user's JWT token for all operations"""
+        return _build_client(self.url, self.anon_key, user_jwt_token)
     
     # Contract operations
-    def get_user_contracts(self, user_jwt: str) -> List[Dict[Any, Any]]:
-        """Get all contracts for the authenticated user with analyses count"""
+    def get_user_contracts(self, user_jwt: str, status: str = None,
+                           page: int = None, per_page: int = None) -> List[Dict[Any, Any]]:
+        """Get contracts for the authenticated user with analyses count.
+
+        Filtering, ordering and pagination run in Postgres so only the
+        requested page crosses the wire. When page/per_page are given the
+        returned list carries the total row count of the filtered set as
+        response count metadata via get_user_contracts_page.
+        """
+        contracts, _ = self.get_user_contracts_page(user_jwt, status=status,
+                                                    page=page, per_page=per_page)
+        return contracts
+
+    def get_user_contracts_page(self, user_jwt: str, status: str = None,
+                                page: int = None, per_page: int = None) -> tuple[List[Dict[Any, Any]], int]:
+        """Get a page of contracts plus the total count of the filtered set"""
         client = self.get_client(user_jwt)
-        
-        # Get all contracts for the user (RLS will filter automatically)
-        response = client.table("contracts").select("*").execute()
+
+        # RLS scopes the query to the user; count=exact piggybacks the
+        # total on the same request, and the embedded aggregate brings
+        # each contract's analyses count back in the same response
+        # instead of a second query
+        query = client.table("contracts").select(
+            "*, analyses_count:contract_analysis(count)", count="exact")
+        if status:
+            query = query.eq("status", status)
+        query = query.order("created_at", desc=True)
+        if page is not None and per_page is not None:
+            start = (page - 1) * per_page
+            query = query.range(start, start + per_page - 1)
+
+        response = query.execute()
         contracts = response.data
-        
-        # For each contract, count the analyses
+        total = response.count if response.count is not None else len(contracts)
+
+        # PostgREST returns the aggregate as [{'count': n}]; flatten it
         for contract in contracts:
-            analyses_response = client.table("contract_analysis").select("id").eq("contract_id", contract['id']).execute()
-            contract['analyses_count'] = len(analyses_response.data)
-        
-        return contracts
+            embedded = contract.get('analyses_count')
+            contract['analyses_count'] = embedded[0]['count'] if embedded else 0
+
+        return contracts, total
     
     def get_contract_by_id(self, contract_id: str, user_jwt: str) -> Dict[Any, Any] | None:
         """Get a specific contract by ID for the authenticated user"""
         client = self.get_client(user_jwt)
-        response = client.table("contracts").select("*").eq("id", contract_id).execute()
-        return response.data[0] if response.data else None
+        # maybe_single returns the bare object (or None) instead of a
+        # one-element array wrapper
+        response = client.table("contracts").select("*").eq("id", contract_id).maybe_single().execute()
+        return response.data if response else None
     
     def create_contract(self, contract_data: Dict[str, Any], user_jwt: str) -> Dict[Any, Any] | None:
         """Create a new contract"""
@@ -51,30 +126,106 @@ class SupabaseService:
         response = client.table("contracts").insert(contract_data).execute()
         return response.data[0] if response.data else None
     
-    def update_contract(self, contract_id: str, updates: Dict[str, Any], user_jwt: str) -> Dict[Any, Any] | None:
-        """Update a contract"""
+    def update_contract(self, contract_id: str, updates: Dict[str, Any], user_jwt: str,
+                        return_row: bool = True) -> Dict[Any, Any] | None:
+        """Update a contract.
+
+        Pass return_row=False when the caller doesn't need the updated
+        row; the server then replies 204 with no body instead of
+        serializing the row back.
+        """
         client = self.get_client(user_jwt)
+        if not return_row:
+            client.table("contracts").update(updates, returning="minimal").eq("id", contract_id).execute()
+            return None
         response = client.table("contracts").update(updates).eq("id", contract_id).execute()
         return response.data[0] if response.data else None
-    
+
     def delete_contract(self, contract_id: str, user_jwt: str) -> bool:
         """Delete a contract"""
         client = self.get_client(user_jwt)
-        response = client.table("contracts").delete().eq("id", contract_id).execute()
-        return len(response.data) > 0
+        # return=minimal skips echoing the deleted row. The client does
+        # not parse Content-Range out of the bodyless 204, so success is
+        # the request completing without an APIError; callers confirm
+        # existence with an RLS-scoped fetch before deleting
+        client.table("contracts").delete(returning="minimal").eq("id", contract_id).execute()
+        return True
     
     # Contract Analysis operations
-    def get_contract_analyses(self, contract_id: str, user_jwt: str) -> List[Dict[Any, Any]]:
-        """Get all analyses for a contract with risk factors"""
+    def get_contract_analyses(self, contract_id: str, user_jwt: str,
+                              limit: int = 50, offset: int = 0) -> List[Dict[Any, Any]]:
+        """Get analyses for a contract with risk factors, newest first.
+
+        The result set is bounded: at most `limit` rows from `offset`,
+        so a contract with a long analysis history can't produce an
+        unbounded response payload.
+        """
         client = self.get_client(user_jwt)
-        response = client.table("contract_analysis").select("*, risk_factors(*)").eq("contract_id", contract_id).execute()
+        response = (
+            client.table("contract_analysis")
+            .select(f"*, {_RISK_FACTOR_COLUMNS}")
+            .eq("contract_id", contract_id)
+            .order("created_at", desc=True)
+            .range(offset, offset + limit - 1)
+            .execute()
+        )
         return response.data
     
+    def get_latest_analysis(self, contract_id: str, user_jwt: str) -> Dict[Any, Any] | None:
+        """Get the most recent analysis for a contract with risk factors"""
+        client = self.get_client(user_jwt)
+        response = (
+            client.table("contract_analysis")
+            .select(f"*, {_RISK_FACTOR_COLUMNS}")
+            .eq("contract_id", contract_id)
+            .order("created_at", desc=True)
+            .limit(1)
+            .maybe_single()
+            .execute()
+        )
+        # maybe_single yields None (no response object) on zero rows
+        return response.data if response else None
+
+    def get_analyses_for_contracts(self, contract_ids: List[str], user_jwt: str,
+                                   columns: str = "*") -> List[Dict[Any, Any]]:
+        """Get all analyses for a set of contracts in a single query.
+
+        Pass an explicit column list when the caller only needs a few
+        fields so large JSONB payloads stay out of the response.
+        """
+        if not contract_ids:
+            return []
+        client = self.get_client(user_jwt)
+        response = client.table("contract_analysis").select(columns).in_("contract_id", contract_ids).execute()
+        return response.data
+
+    def get_latest_analyses_for_contracts(self, contract_ids: List[str], user_jwt: str) -> Dict[str, Dict[Any, Any]]:
+        """Get the newest analysis per contract in a single query.
+
+        Returns a mapping of contract_id to its most recent analysis row.
+        Rows arrive ordered newest-first, so the first row seen for each
+        contract wins (PostgREST has no DISTINCT ON).
+        """
+        if not contract_ids:
+            return {}
+        client = self.get_client(user_jwt)
+        response = (
+            client.table("contract_analysis")
+            .select("contract_id, analysis_results, created_at")
+            .in_("contract_id", contract_ids)
+            .order("created_at", desc=True)
+            .execute()
+        )
+        latest = {}
+        for row in response.data:
+            latest.setdefault(row['contract_id'], row)
+        return latest
+
     def get_analysis_by_id(self, analysis_id: str, user_jwt: str) -> Dict[Any, Any] | None:
         """Get a specific analysis by ID with risk factors"""
         client = self.get_client(user_jwt)
-        response = client.table("contract_analysis").select("*, risk_factors(*)").eq("id", analysis_id).execute()
-        return response.data[0] if response.data else None
+        response = client.table("contract_analysis").select(f"*, {_RISK_FACTOR_COLUMNS}").eq("id", analysis_id).maybe_single().execute()
+        return response.data if response else None
     
     def create_analysis(self, analysis_data: Dict[str, Any], user_jwt: str) -> Dict[Any, Any] | None:
         """Create a new contract analysis"""
@@ -90,10 +241,22 @@ class SupabaseService:
     
     # Risk Factor operations
     def create_risk_factors(self, risk_factors: List[Dict[str, Any]], user_jwt: str) -> List[Dict[Any, Any]]:
-        """Create multiple risk factors for an analysis"""
+        """Create multiple risk factors for an analysis.
+
+        Inserts are chunked and use return=minimal — no caller reads
+        the echoed rows, so the server replies 204 instead of
+        serializing every inserted record back. Returns the input
+        records for convenience.
+        """
+        if not risk_factors:
+            return []
         client = self.get_client(user_jwt)
-        response = client.table("risk_factors").insert(risk_factors).execute()
-        return response.data
+        for start in range(0, len(risk_factors), _RISK_FACTOR_INSERT_CHUNK):
+            client.table("risk_factors").insert(
+                risk_factors[start:start + _RISK_FACTOR_INSERT_CHUNK],
+                returning="minimal"
+            ).execute()
+        return risk_factors
     
     def get_risk_factors_by_analysis(self, analysis_id: str, user_jwt: str) -> List[Dict[Any, Any]]:
         """Get all risk factors for an analysis"""
@@ -101,16 +264,63 @@ class SupabaseService:
         response = client.table("risk_factors").select("*").eq("analysis_id", analysis_id).execute()
         return response.data
     
+    def get_dashboard_counts(self, user_jwt: str) -> Dict[Any, Any] | None:
+        """Get the dashboard count aggregates in a single RPC round-trip.
+
+        Calls the get_user_dashboard_stats SQL function (see the supabase
+        migrations); returns None if the function is not deployed so the
+        caller can fall back to computing the counts client-side.
+        """
+        client = self.get_client(user_jwt)
+        try:
+            # params is a required positional in this client version
+            response = client.rpc("get_user_dashboard_stats", {}).execute()
+            return response.data
+        except APIError:
+            # Function not deployed on this project yet; anything else
+            # (a coding error, network failure) should surface
+            return None
+
     # Utility methods
     def generate_uuid(self) -> str:
-        """Generate a new UUID string"""
-        return str(uuid.uuid4())
+        """Generate a new UUID string.
+
+        Uses the undashed hex form — Postgres accepts it for uuid
+        columns and it skips the dashed-string formatting pass.
+        """
+        return uuid.uuid4().hex
     
     def verify_user_owns_contract(self, contract_id: str, user_jwt: str) -> bool:
         """Verify that a user owns a specific contract"""
+        # Key on a digest of the JWT so the cache doesn't hold raw tokens
+        cache_key = (hashlib.blake2b(user_jwt.encode(), digest_size=16).digest(), contract_id)
+        now = time.time()
+        with _ownership_lock:
+            entry = _ownership_cache.get(cache_key)
+            if entry and entry > now:
+                return True
+
         client = self.get_client(user_jwt)
-        response = client.table("contracts").select("id").eq("id", contract_id).execute()
-        return len(response.data) > 0
+        try:
+            # The user_owns_contract SQL function (see the supabase
+            # migrations) answers with a cached plan in one call
+            response = client.rpc("user_owns_contract", {"cid": contract_id}).execute()
+            owns = bool(response.data)
+        except APIError:
+            # Function not deployed yet: select the bare id with an
+            # exact count — at most one tiny row crosses the wire (the
+            # pinned client has no HEAD-request support)
+            response = client.table("contracts").select("id", count="exact").eq("id", contract_id).limit(1).execute()
+            owns = bool(response.count)
+
+        # Only confirmed ownership is cached: a negative result may just
+        # mean the contract was created a moment ago
+        if owns:
+            with _ownership_lock:
+                if len(_ownership_cache) >= _OWNERSHIP_MAX_ENTRIES:
+                    _ownership_cache.clear()
+                _ownership_cache[cache_key] = now + _OWNERSHIP_TTL_SECONDS
+        return owns
 
 # Global instance
 supabase_service = SupabaseService()
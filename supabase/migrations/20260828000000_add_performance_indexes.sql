@@ -0,0 +1,11 @@
+-- Composite indexes for the hot query paths.
+--
+-- contracts: the list endpoint and dashboard filter by user_id (via RLS),
+-- optionally by status, and order by created_at DESC.
+create index if not exists ix_contracts_user_status_created
+    on contracts (user_id, status, created_at desc);
+
+-- contract_analysis: the latest-analysis lookup filters by contract_id and
+-- orders by created_at DESC with LIMIT 1, which this index serves directly.
+create index if not exists ix_contract_analysis_contract_created
+    on contract_analysis (contract_id, created_at desc);
@@ -0,0 +1,33 @@
+-- Computes the dashboard counts in one round-trip instead of shipping
+-- every contract and analysis row to the API just to count them.
+-- SECURITY INVOKER keeps the tables' RLS policies in effect, so the
+-- counts are scoped to the calling user.
+create or replace function get_user_dashboard_stats()
+returns jsonb
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+    select jsonb_build_object(
+        'total_contracts', (select count(*) from contracts),
+        'status_breakdown', (
+            select coalesce(jsonb_object_agg(status, n), '{}'::jsonb)
+            from (
+                select status, count(*) as n
+                from contracts
+                group by status
+            ) s
+        ),
+        'risk_levels', (
+            select coalesce(jsonb_object_agg(risk_level, n), '{}'::jsonb)
+            from (
+                select a.risk_level, count(*) as n
+                from contract_analysis a
+                join contracts c on c.id = a.contract_id
+                where a.risk_level is not null
+                group by a.risk_level
+            ) r
+        )
+    );
+$$;
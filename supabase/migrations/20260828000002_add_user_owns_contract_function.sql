@@ -0,0 +1,13 @@
+-- Ownership check as a single function call so the hot authorization
+-- query runs a cached plan instead of an ad-hoc filtered select.
+-- security invoker keeps RLS in force: the EXISTS only sees rows the
+-- calling user is allowed to see, so "not visible" reads as not owned.
+create or replace function user_owns_contract(cid uuid)
+returns boolean
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+  select exists(select 1 from contracts where id = cid);
+$$;